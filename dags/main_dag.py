@@ -1,3 +1,5 @@
+import os
+import tempfile
 import pandas as pd
 from airflow import DAG
 from airflow.operators.python import PythonOperator
@@ -15,13 +17,21 @@ default_args = {
 
 def scrape_task(**kwargs):
     df = main_scrape(job_count=200)
-    kwargs['ti'].xcom_push(key='job_df', value=df.to_dict(orient='records'))
+    # Hand the jobs over as a parquet file; only its path goes through XCom
+    # The run id is always set (ts_nodash is missing for runs without a logical date)
+    run_id = kwargs['ti'].run_id.replace(':', '_').replace('+', '_')
+    path = os.path.join(tempfile.gettempdir(), f"linkedin_jobs_{run_id}.parquet")
+    # Descriptions dominate the file and compress well under zstd
+    df.to_parquet(path, index=False, compression="zstd")
+    kwargs['ti'].xcom_push(key='job_df_path', value=path)
 
 def enrichment_task(**kwargs):
     ti = kwargs['ti']
-    records = ti.xcom_pull(key='job_df', task_ids='scrape_jobs')
-    df = pd.DataFrame.from_records(records)
+    path = ti.xcom_pull(key='job_df_path', task_ids='scrape_jobs')
+    df = pd.read_parquet(path)
     main_enrichment(df)
+    # Only clean up after a successful load, so a retried task can still read the file
+    os.remove(path)
 
 with DAG(
     dag_id='linkedin_jobs_pipeline',
@@ -1,122 +1,201 @@
+import os
+import re
+import numpy as np
 import pandas as pd
 import spacy
 import duckdb
+import fasttext
+from joblib import Parallel, delayed
 from spacy.matcher import PhraseMatcher
 from skillNer.general_params import SKILL_DB
 from skillNer.skill_extractor_class import SkillExtractor
-from langdetect import detect
-
-def should_remove(skill_name: str, desc: str = "") -> bool:
-    BLACKLIST = {
-        "e (programming language)", "library for www in perl",
-        "component object model (com)", "hostile work environment", "sage safe x3",
-        "inquiry", "workflows", "flooring", "target 3001!"
-    }
+from skillNer.cleaner import Cleaner
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NLP_BATCH_SIZE = 64
+# Every worker holds its own en_core_web_lg (~1 GB), so keep this modest
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", min(4, os.cpu_count() or 1)))
+# Trigger/task checks only need sentences, tags, dependencies and vectors;
+# attribute_ruler stays on because it maps tags to token.pos_
+NLP_DISABLED_PIPES = ["ner", "lemmatizer"]
+# fastText language-id model (~126 MB, not in the repo; see README for setup)
+LID_MODEL_URL = "https://dl.fbaipublicfiles.com/fasttext/supervised-models/lid.176.bin"
+LID_MODEL_PATH = os.getenv("LID_MODEL_PATH", os.path.join(BASE_DIR, "data", "lid.176.bin"))
+
+SKILL_BLACKLIST = frozenset({
+    "e (programming language)", "library for www in perl",
+    "component object model (com)", "hostile work environment", "sage safe x3",
+    "inquiry", "workflows", "flooring", "target 3001!"
+})
+SKILL_NAMES = {skill_id: skill['skill_name'] for skill_id, skill in SKILL_DB.items()}
+SKILL_TYPES = {skill_id: skill['skill_type'] for skill_id, skill in SKILL_DB.items()}
+
+# Same cleaning SkillExtractor.annotate applies before tokenizing, so word counts line up
+SKILL_TEXT_CLEANER = Cleaner(
+    to_lowercase=False,
+    include_cleaning_functions=["remove_punctuation", "remove_extra_space"]
+)
+
+R_CONTEXT_RE = re.compile(r"r programming|rstudio")
+C_CONTEXT_RE = re.compile(r"c programming|embedded c|c\+\+")
+
+def should_remove(skill_name: str, desc_lower: str = "") -> bool:
     s = skill_name.lower().strip()
-    if s in BLACKLIST:
+    if s in SKILL_BLACKLIST:
         return True
     if s in {"r", "c"}:
-        context = desc.lower()
-        if s == "r" and ("r programming" in context or "rstudio" in context):
+        if s == "r" and R_CONTEXT_RE.search(desc_lower):
             return False
-        if s == "c" and ("c programming" in context or "embedded c" in context or "c++" in context):
+        if s == "c" and C_CONTEXT_RE.search(desc_lower):
             return False
         return True
     if len(s) <= 2:
         return True
     return False
 
-def main_enrichment(df: pd.DataFrame):
-    nlp = spacy.load("en_core_web_lg")
-    skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
-
-    seed_triggers = [
-        "proficient", "experience", "skills", "required", "knowledge", "expertise", "purpose",
-        "ability", "qualifications", "role", "responsible", "duties", "looking", "seeking",
-        "task", "candidate", "ability"
-    ]
-    seed_docs = [nlp(trigger) for trigger in seed_triggers]
-    similarity_threshold = 0.75
-
-    def has_trigger(sentence_doc):
-        for token in sentence_doc:
-            if not token.has_vector:
-                continue
-            for seed in seed_docs:
-                if token.similarity(seed) >= similarity_threshold:
-                    return True
-        return False
-
-    def is_task_sentence(sentence_doc):
-        for token in sentence_doc[:2]:
-            if token.pos_ == "VERB" and (token.dep_ in {"ROOT", "conj"}):
-                return True
-            if token.pos_ == "VERB" and token.tag_ == "VBG":
-                return True
+SEED_TRIGGERS = [
+    "proficient", "experience", "skills", "required", "knowledge", "expertise", "purpose",
+    "ability", "qualifications", "role", "responsible", "duties", "looking", "seeking",
+    "task", "candidate", "ability"
+]
+SIMILARITY_THRESHOLD = 0.75
+
+# Each enrichment worker process loads its own spaCy pipeline and skill extractor once
+_NLP = None
+_SKILL_EXTRACTOR = None
+_SEED_MATRIX = None
+
+def load_skill_models():
+    global _NLP, _SKILL_EXTRACTOR, _SEED_MATRIX
+    if _NLP is None:
+        _NLP = spacy.load("en_core_web_lg")
+        _SKILL_EXTRACTOR = SkillExtractor(_NLP, SKILL_DB, PhraseMatcher)
+        seed_docs = [_NLP(trigger) for trigger in SEED_TRIGGERS]
+        _SEED_MATRIX = np.stack([seed.vector / seed.vector_norm for seed in seed_docs])
+    return _NLP, _SKILL_EXTRACTOR, _SEED_MATRIX
+
+def has_trigger(sentence_doc, seed_matrix):
+    vectors = [token.vector for token in sentence_doc if token.has_vector]
+    if not vectors:
         return False
+    token_matrix = np.stack(vectors)
+    norms = np.linalg.norm(token_matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    similarities = (token_matrix / norms) @ seed_matrix.T
+    return bool(similarities.max() >= SIMILARITY_THRESHOLD)
+
+def is_task_sentence(sentence_doc):
+    for token in sentence_doc[:2]:
+        if token.pos_ == "VERB" and (token.dep_ in {"ROOT", "conj"}):
+            return True
+        if token.pos_ == "VERB" and token.tag_ == "VBG":
+            return True
+    return False
 
-    def is_english(text):
-        try:
-            return detect(text) == 'en'
-        except:
-            return False
-
-    df = df[df["job description"].notna()]
-    df = df[df["job description"].apply(is_english)]
-
-    df['hard_skills'] = ""
-    df['soft_skills'] = ""
-
-    for idx, row in df.iterrows():
-        job_description = row["job description"]
-        doc = nlp(job_description)
-        sentences = list(doc.sents)
-
-        full_matches, ngram_scored, soft_skills, hard_skills = [], [], [], []
-
-        for sent in sentences:
-            if has_trigger(sent) or is_task_sentence(sent):
-                annotations = skill_extractor.annotate(sent.text)
-                for data in annotations['results']['full_matches']:
-                    skill_name = SKILL_DB[data['skill_id']]['skill_name']
-                    if not should_remove(skill_name, job_description):
-                        full_matches.append(data['skill_id'])
-                for data in annotations['results']['ngram_scored']:
-                    skill_name = SKILL_DB[data['skill_id']]['skill_name']
-                    if not should_remove(skill_name, job_description):
-                        ngram_scored.append(data['skill_id'])
-
-        for skill_id in set(full_matches + ngram_scored):
-            skill_type = SKILL_DB[skill_id]['skill_type']
-            skill_name = SKILL_DB[skill_id]['skill_name']
+def extract_skills(texts):
+    """Return a (hard_skills, soft_skills) pair of comma-joined strings per description"""
+    nlp, skill_extractor, seed_matrix = load_skill_models()
+    docs = nlp.pipe(texts, batch_size=NLP_BATCH_SIZE, disable=NLP_DISABLED_PIPES)
+    skills = []
+
+    for job_description, doc in zip(texts, docs):
+        desc_lower = job_description.lower()
+        skill_ids, soft_skills, hard_skills = set(), [], []
+
+        # annotate all flagged sentences in one call; skillNer strips the punctuation between
+        # them, so remember which sentence each of its words came from
+        flagged, word_sentence = [], []
+        for sent in doc.sents:
+            if not (has_trigger(sent, seed_matrix) or is_task_sentence(sent)):
+                continue
+            cleaned = SKILL_TEXT_CLEANER(sent.text)
+            if cleaned:
+                word_sentence.extend([len(flagged)] * len(nlp.tokenizer(cleaned.lower())))
+                flagged.append(cleaned)
+
+        if flagged:
+            results = skill_extractor.annotate(" ".join(flagged))['results']
+            for data in results['full_matches'] + results['ngram_scored']:
+                # drop matches that span the boundary between two flagged sentences
+                if len({word_sentence[i] for i in data['doc_node_id']}) > 1:
+                    continue
+                skill_id = data['skill_id']
+                if skill_id not in skill_ids and not should_remove(SKILL_NAMES[skill_id], desc_lower):
+                    skill_ids.add(skill_id)
+
+        for skill_id in skill_ids:
+            skill_type = SKILL_TYPES[skill_id]
+            skill_name = SKILL_NAMES[skill_id]
             if skill_type == 'Soft Skill':
                 soft_skills.append(skill_name)
             elif skill_type == 'Hard Skill':
                 hard_skills.append(skill_name)
 
-        df.at[idx, 'hard_skills'] = ", ".join(hard_skills)
-        df.at[idx, 'soft_skills'] = ", ".join(soft_skills)
+        skills.append((", ".join(hard_skills), ", ".join(soft_skills)))
+
+    return skills
+
+def main_enrichment(df: pd.DataFrame):
+    if not os.path.isfile(LID_MODEL_PATH):
+        raise FileNotFoundError(
+            f"fastText language-id model not found at {LID_MODEL_PATH}. "
+            f"Download it from {LID_MODEL_URL} or point LID_MODEL_PATH at an existing copy."
+        )
+    lid_model = fasttext.load_model(LID_MODEL_PATH)
+
+    def english_mask(texts):
+        # fastText rejects newlines and only needs the opening of each text
+        labels, _ = lid_model.predict([text.replace("\n", " ")[:1000] for text in texts])
+        return np.array([label[0] == "__label__en" for label in labels], dtype=bool)
+
+    descriptions = df["job description"]
+    mask = descriptions.notna().to_numpy()
+    mask[mask] = english_mask(descriptions[mask])
+    df = df.loc[mask].reset_index(drop=True)
+
+    texts = df["job description"].tolist()
+    if texts:
+        # One interleaved shard per worker, so each process loads the models once
+        n_shards = max(1, min(ENRICHMENT_WORKERS, len(texts)))
+        shards = [texts[i::n_shards] for i in range(n_shards)]
+        shard_results = Parallel(n_jobs=n_shards, backend="loky")(
+            delayed(extract_skills)(shard) for shard in shards
+        )
+
+        skills = [None] * len(texts)
+        for i, shard_skills in enumerate(shard_results):
+            skills[i::n_shards] = shard_skills
+
+        df['hard_skills'] = [hard for hard, _ in skills]
+        df['soft_skills'] = [soft for _, soft in skills]
+    else:
+        # No English descriptions left: don't start a worker just to load the models
+        df['hard_skills'] = pd.Series(dtype="string")
+        df['soft_skills'] = pd.Series(dtype="string")
+
+    # Arrow-backed string columns let DuckDB scan the frame without touching Python objects.
+    # Numeric columns keep their dtypes: whole-valued or all-NaN floats (e.g. salaries when
+    # Adzuna has no data) would otherwise become int64 and create the table with BIGINT columns.
+    df = df.convert_dtypes(dtype_backend='pyarrow', convert_integer=False, convert_floating=False)
 
     conn = duckdb.connect('/home/morsi/airflow/dbt_project/job_postings.duckdb')
     conn.register('raw_df', df)
 
-    table_exists = conn.execute("""
-        SELECT COUNT(*)
-        FROM information_schema.tables
-        WHERE table_schema = 'main' 
-        AND table_name = 'raw_job_postings'
-    """).fetchone()[0] > 0
-
-    if table_exists:
-        conn.execute("""
-            DELETE FROM raw_job_postings
-            WHERE job_link IN (SELECT job_link FROM raw_df)
-        """)
-        conn.execute("""
-            INSERT INTO raw_job_postings
-            SELECT * FROM raw_df
-        """)
-    else:
-        conn.execute("CREATE TABLE raw_job_postings AS SELECT * FROM raw_df")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS raw_job_postings AS
+        SELECT * FROM raw_df LIMIT 0
+    """)
+
+    conn.execute("BEGIN TRANSACTION")
+    conn.execute("""
+        DELETE FROM raw_job_postings
+        WHERE job_link IN (SELECT job_link FROM raw_df)
+    """)
+    conn.execute("""
+        INSERT INTO raw_job_postings
+        SELECT * FROM raw_df
+    """)
+    conn.execute("COMMIT")
 
     conn.close()
\ No newline at end of file
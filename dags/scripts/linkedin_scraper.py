@@ -1,5 +1,5 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
 import re
 import time
@@ -8,11 +8,16 @@ import random
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import unicodedata
+import html
 from rapidfuzz import process, fuzz
 import numpy as np
-import json
+import orjson
 from dotenv import load_dotenv
 import os
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
 load_dotenv()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +35,110 @@ PPP_ADJUSTMENT_FACTOR = 0.7
 WORLD_BANK_PPP_URL = "https://api.worldbank.org/v2/country/EG/indicator/PA.NUS.PPP?format=json"
 ADZUNA_HISTOGRAM_URL = f"https://api.adzuna.com/v1/api/jobs/{COUNTRY}/histogram"
 SLEEP_INTERVAL = 1  # seconds between requests
+MAX_WORKERS = 4  # concurrent job-page fetches
+FLEXIBILITY_SCAN_CHARS = 4096  # workplace type sits in the top card, ahead of the description
+# Read-only so no caller can mutate the headers every session starts from
+REQUEST_HEADERS = MappingProxyType({
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/117.0.0.0 Safari/537.36"
+})
+
+# =======================
+# Search Keywords
+# =======================
+SEARCH_KEYWORDS = (
+    # ====== Core Software & Development ======
+    "software OR backend OR frontend OR full stack OR web OR mobile OR android OR ios OR "
+    "react OR node OR python OR java OR c# OR .net OR php OR ruby OR kotlin OR swift OR "
+    "flutter OR react native OR angular OR vue OR typescript OR javascript OR go OR rust OR "
+    "devops OR cloud OR sre OR infrastructure OR platform OR automation OR ci cd OR "
+    "aws OR azure OR gcp OR kubernetes OR docker OR terraform OR ansible OR linux OR bash OR "
+    "microservices OR api OR rest OR graphql OR serverless OR distributed systems OR scalability OR "
+
+    # ====== Data, AI & ML ======
+    "data OR analytics OR etl OR big data OR hadoop OR spark OR databricks OR powerbi OR tableau OR "
+    "ml OR machine learning OR ai OR artificial intelligence OR deep learning OR nlp OR llm OR "
+    "data science OR data engineer OR data scientist OR ml engineer OR mlops OR "
+    "database OR sql OR nosql OR postgres OR mysql OR mongodb OR oracle OR snowflake OR redshift OR "
+
+    # ====== Cybersecurity & Networking ======
+    "security OR cybersecurity OR infosec OR appsec OR pentest OR penetration testing OR "
+    "network OR sysadmin OR systems OR infrastructure OR vpn OR soc OR siem OR firewall OR "
+    "identity OR iam OR compliance OR risk OR zero trust OR endpoint OR cloud security OR "
+
+    # ====== Embedded, Hardware & IoT ======
+    "embedded OR firmware OR iot OR robotics OR electronics OR fpga OR hardware OR "
+    "arduino OR raspberry pi OR sensor OR automation engineer OR mechatronics OR control systems OR "
+
+    # ====== Testing & QA ======
+    "qa OR quality assurance OR test automation OR selenium OR cypress OR playwright OR testing OR "
+    "manual testing OR performance testing OR regression testing OR test engineer OR test analyst OR "
+
+    # ====== UI/UX & Product ======
+    "ui OR ux OR ui/ux OR user interface OR user experience OR "
+    "product design OR visual design OR interaction design OR design systems OR "
+    "usability OR wireframe OR prototype OR figma OR sketch OR adobe xd OR invision OR zeplin OR "
+    "product manager OR technical product manager OR scrum master OR agile coach OR "
+    "service design OR design thinking OR human centered design OR accessibility OR "
+
+    # ====== Graphic, Motion, 3D & Creative Tech ======
+    "graphic design OR visual design OR motion design OR motion graphics OR animation OR illustrator OR photoshop OR "
+    "after effects OR premiere OR indesign OR blender OR maya OR cinema 4d OR houdini OR 3ds max OR "
+    "concept art OR digital art OR creative technologist OR creative developer OR multimedia OR "
+    "game OR game design OR game developer OR unity OR unreal OR vr OR ar OR xr OR virtual reality OR augmented reality OR "
+    "storyboard OR video editing OR content creation OR vfx OR sfx OR compositing OR visual effects OR "
+
+    # ====== Blockchain, Web3 & Emerging Tech ======
+    "blockchain OR crypto OR solidity OR smart contract OR web3 OR nft OR dapp OR defi OR metaverse OR "
+
+    # ====== Support, Operations & General IT ======
+    "support OR helpdesk OR service desk OR it support OR systems support OR technical support OR "
+    "network engineer OR desktop support OR system administrator OR field engineer OR "
+    "technician OR specialist OR consultant OR architect OR solution architect OR software architect OR systems architect OR "
+
+    # ====== Experience Levels ======
+    "lead OR senior OR junior OR intern OR entry level OR associate OR graduate OR trainee OR "
+    "manager OR director OR head OR principal OR vp OR cto OR team lead OR mentor OR "
+    "it OR tech OR technology OR information technology"
+)
+SEARCH_KEYWORDS_Q = urllib.parse.quote_plus(SEARCH_KEYWORDS)
+
+# =======================
+# Regex Patterns
+# =======================
+TOPCARD_TITLE_RE = re.compile(r"topcard__title")
+TOPCARD_FLAVOR_RE = re.compile(r"topcard__flavor")
+COMPANY_HREF_RE = re.compile(r"/company/")
+DESCRIPTION_CLASS_RE = re.compile(r"(show-more-less-html__markup|description__text)")
+DESCRIPTION_FALLBACK_CLASS_RE = re.compile(r"(description|job-description|details)")
+LOCATION_RE = re.compile(r'\b(remote|egypt|cairo|dubai|saudi|uk|usa|canada|germany|france|australia)\b', re.I)
+EMPLOYMENT_TYPE_RE = re.compile(r'\b(full.?time|part.?time|contract|internship|temporary|freelance)\b', re.I)
+FLEXIBILITY_RE = re.compile(r"remote|hybrid|on-?site", re.I)
+JSON_LD_RE = re.compile(rb'<script[^>]*application/ld\+json[^>]*>(.*?)</script>', re.S | re.I)
+SPACES_RE = re.compile(r'[ \t]+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Mojibake fixes, applied in a single pass with the longest sequences tried first
+MOJIBAKE_FIXES = {
+    'â€™': "'", 'â€œ': '"', 'â€': '"', 'â€“': '–', 'â€”': '—',
+    'â€¢': '•', 'â€¦': '…', 'Â': '', 'â€‹': '', 'â€Š': ' ',
+    'Ã©': 'é', 'Ã¨': 'è', 'Ã¡': 'á', 'Ã ': 'à', 'Ã³': 'ó',
+    'Ã²': 'ò', 'Ã­': 'í', 'Ã±': 'ñ', 'Ã§': 'ç', 'Ã¼': 'ü',
+    'Ã¶': 'ö', 'Ã¤': 'ä',
+}
+MOJIBAKE_RE = re.compile(
+    "|".join(re.escape(bad) for bad in sorted(MOJIBAKE_FIXES, key=len, reverse=True))
+)
+
+# Only the top card, description and job-criteria subtrees of a job page are parsed;
+# JSON-LD is pulled from the raw HTML with JSON_LD_RE instead
+JOB_SECTION_CLASS_RE = re.compile(r"top-?card|description|details|job-criteria|show-more-less-html")
+JOB_STRAINER = SoupStrainer(class_=JOB_SECTION_CLASS_RE)
+# Search result cards carry the job id in data-entity-urn; no need to parse the list page
+JOB_ID_RE = re.compile(rb'data-entity-urn="urn:li:jobPosting:(\d+)"')
+JOB_VIEW_URL = "https://www.linkedin.com/jobs/view/{}"
 
 # =======================
 # Load Data
@@ -40,44 +149,90 @@ onet_titles = onet_df['Title'].dropna().str.lower().tolist()
 # =======================
 # Helper Functions
 # =======================
-def map_to_onet(title):
-    title_lower = title.lower()
-    match, score, _ = process.extractOne(title_lower, onet_titles, scorer=fuzz.token_sort_ratio)
-    if score >= MATCH_THRESHOLD:
-        return match, score
-    return None, None
+def map_to_onet(titles):
+    """Match all titles against the ONET list in one cdist call; returns (match, score) per title"""
+    queries = [title.lower() if title else "" for title in titles]
+    # Repeated titles are common, so only score each distinct one
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return []
+    # Both sides are lowercased up front, so no per-comparison processor is needed
+    scores = process.cdist(
+        unique_queries, onet_titles, scorer=fuzz.token_sort_ratio, processor=None, workers=-1
+    )
+    best = scores.argmax(axis=1)
+    matches = {}
+    for query, idx, row_scores in zip(unique_queries, best, scores):
+        score = float(row_scores[idx])
+        if query and score >= MATCH_THRESHOLD:
+            matches[query] = (onet_titles[idx], score)
+        else:
+            matches[query] = (None, None)
+    return [matches[query] for query in queries]
+
+def create_session(pool_connections=1):
+    """Create a session with retry strategy and proper headers"""
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=5,
+        backoff_factor=1,
+        backoff_jitter=0.5,  # spread out retries from concurrent workers
+        status_forcelist=[429, 500, 502, 503, 504],
+        respect_retry_after_header=True,
+        allowed_methods=frozenset(["HEAD", "GET", "OPTIONS"])
+    )
+    # One keep-alive pool per host the session talks to (just LinkedIn for scraping)
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy, pool_connections=pool_connections, pool_maxsize=32, pool_block=False
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(REQUEST_HEADERS)
+    return session
+
+
+# Shared keep-alive session for the World Bank and Adzuna API calls; one pool per host
+API_SESSION = create_session(pool_connections=2)
 
+@functools.lru_cache(maxsize=1)
 def get_ppp():
-    res = requests.get(WORLD_BANK_PPP_URL)
-    data = res.json()
+    res = API_SESSION.get(WORLD_BANK_PPP_URL)
+    data = orjson.loads(res.content)
     records = data[1]
     records.sort(key=lambda x: int(x['date']), reverse=True)
     return records[0]['value'] * PPP_ADJUSTMENT_FACTOR
 
-PPP = get_ppp()
-
+@functools.lru_cache(maxsize=1024)
 def get_salary_histogram(job_title):
     params = {
         "app_id": APP_ID,
         "app_key": APP_KEY,
         "what": job_title,
     }
-    response = requests.get(ADZUNA_HISTOGRAM_URL, params=params)
-    data = response.json()
+    response = API_SESSION.get(ADZUNA_HISTOGRAM_URL, params=params)
+    data = orjson.loads(response.content)
     return data.get("histogram", {})
 
 def aggregate_stats(histogram):
-    counter = 0
-    salaries = []
-    for salary_str, count in histogram.items():
-        salary = int(salary_str)
-        counter += count
-        salaries.extend([salary] * count)
-    if not salaries:
+    # Stats are computed on (salary, count) pairs instead of expanding every count
+    salaries = np.fromiter(map(int, histogram.keys()), dtype=np.int64, count=len(histogram))
+    counts = np.fromiter(histogram.values(), dtype=np.int64, count=len(histogram))
+    order = np.argsort(salaries)
+    salaries, counts = salaries[order], counts[order]
+    counter = int(counts.sum())
+    if counter == 0:
         return None, None, None, None
-    mean_salary = np.mean(salaries)
-    median_salary = np.median(salaries)
-    percentiles = np.percentile(salaries, [10, 90])
+    cumulative = np.cumsum(counts)
+
+    def percentile(q):
+        # Same linear interpolation as np.percentile over the expanded salary list
+        position = q / 100 * (counter - 1)
+        lower, upper = np.searchsorted(cumulative, [np.floor(position), np.ceil(position)], side="right")
+        return salaries[lower] + (salaries[upper] - salaries[lower]) * (position - np.floor(position))
+
+    mean_salary = (salaries * counts).sum() / counter
+    median_salary = percentile(50)
+    percentiles = np.array([percentile(10), percentile(90)])
     return mean_salary, median_salary, percentiles, counter
 
 def clean_job_description(raw_html):
@@ -90,42 +245,14 @@ def clean_job_description(raw_html):
     if not raw_html:
         return ""
 
-    # 1. Parse HTML and extract text
-    # We use separator="\n" to add newlines where tags like <p> or <li> end.
-    soup = BeautifulSoup(raw_html, "html.parser")
-    text = soup.get_text(separator="\n", strip=True)
-
-    # 2. Fix common encoding errors (mojibake)
-    # This dictionary fixes symbols like the 'â€™' in your example
-    mojibake_fixes = {
-        'â€™': "'",
-        'â€œ': '"',
-        'â€': '"',
-        'â€“': '–',
-        'â€”': '—',
-        'â€¢': '•',
-        'â€¦': '…',
-        'Â': '', 
-        'â€‹': '',
-    }
-    
-    for bad, good in mojibake_fixes.items():
-        text = text.replace(bad, good)
+    # 1. Strip tags and extract text
+    # Entities are decoded first so entity-escaped markup is stripped too; every tag then
+    # becomes a line break, like get_text(separator="\n", strip=True), without a parse tree.
+    text = HTML_TAG_RE.sub("\n", html.unescape(raw_html))
+    text = "\n".join(line for line in map(str.strip, text.splitlines()) if line)
 
-    # 3. Normalize whitespace and characters
-    # NFKC normalizes characters (e.g., turning fancy quotes into standard ones)
-    text = unicodedata.normalize('NFKC', text)
-    
-    # Replace non-breaking spaces with regular spaces
-    text = text.replace('\u00a0', ' ').replace('\xa0', ' ')
-    
-    # Consolidate multiple spaces into one
-    text = re.sub(r'[ \t]+', ' ', text)
-    
-    # Consolidate multiple newlines (more than 2) into just two
-    text = re.sub(r'\n\s*\n+', '\n\n', text)
-    
-    return text.strip()
+    # 2. Fix mojibake and normalize characters/whitespace
+    return clean_text(text)
 
 
 
@@ -135,41 +262,55 @@ def clean_text(text):
     if not text:
         return text
 
-    mojibake_fixes = {
-        'â€™': "'", 'â€œ': '"', 'â€': '"', 'â€“': '–', 'â€”': '—',
-        'â€¢': '•', 'â€¦': '…', 'Â': '', 'â€‹': '', 'â€Š': ' ',
-        'Ã©': 'é', 'Ã¨': 'è', 'Ã¡': 'á', 'Ã ': 'à', 'Ã³': 'ó',
-        'Ã²': 'ò', 'Ã­': 'í', 'Ã±': 'ñ', 'Ã§': 'ç', 'Ã¼': 'ü',
-        'Ã¶': 'ö', 'Ã¤': 'ä',
-    }
-    for bad, good in mojibake_fixes.items():
-        text = text.replace(bad, good)
+    text = MOJIBAKE_RE.sub(lambda m: MOJIBAKE_FIXES[m.group(0)], text)
 
     text = unicodedata.normalize('NFKC', text)
     text = text.replace('\u00a0', ' ').replace('\xa0', ' ')
-    text = re.sub(r'[ \t]+', ' ', text)
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = SPACES_RE.sub(' ', text)
+    text = BLANK_LINES_RE.sub('\n\n', text)
     return text.strip()
 
 
-def create_session():
-    """Create a session with retry strategy and proper headers"""
-    session = requests.Session()
-    retry_strategy = Retry(
-        total=5,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=frozenset(["HEAD", "GET", "OPTIONS"])
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/117.0.0.0 Safari/537.36"
-    })
-    return session
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces request starts by a random delay from delay_range.
+    The delay is stretched after failures and eased back as requests succeed.
+    """
+
+    def __init__(self, delay_range, max_backoff=8.0):
+        self.delay_range = delay_range
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+        self._backoff = 1.0
+        self._rng = random.Random()
+
+    def wait(self):
+        """Block until the caller's slot comes up; other threads keep running"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._rng.uniform(*self.delay_range) * self._backoff
+        time.sleep(slot - now)
+
+    def on_success(self):
+        """Shrink the spacing a little, never below delay_range"""
+        with self._lock:
+            self._backoff = max(1.0, self._backoff * 0.9)
+
+    def on_failure(self):
+        """Double the spacing, up to max_backoff times delay_range"""
+        with self._lock:
+            self._backoff = min(self.max_backoff, self._backoff * 2)
+
+    def pause(self, min_seconds, max_seconds):
+        """
+        Delay slots handed out from now on by a random min_seconds to max_seconds.
+        Threads already sleeping on a reserved slot keep their original time.
+        """
+        with self._lock:
+            seconds = self._rng.uniform(min_seconds, max_seconds)
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
 
 
 def get_absolute_url(href: str):
@@ -183,31 +324,31 @@ def get_absolute_url(href: str):
     return None
 
 
-def get_full_job_description(job_soup):
+def get_full_job_description(job_soup, page_html):
     """
     Extract the full job description (no filtering).
     Tries multiple methods to ensure maximum data capture.
     """
-    # Try JSON-LD
-    json_ld_scripts = job_soup.find_all('script', type='application/ld+json')
-    for script in json_ld_scripts:
+    # Try JSON-LD, read straight from the raw HTML so scripts never enter the soup
+    for json_ld in JSON_LD_RE.findall(page_html):
         try:
-            data = json.loads(script.string)
+            data = orjson.loads(json_ld)
             if isinstance(data, dict):
                 data = [data]
             for item in data:
                 if item.get('@type') == 'JobPosting' and 'description' in item:
-                    return clean_text(item['description'])
+                    # JSON-LD descriptions are HTML; the DOM branches below are already plain text
+                    return clean_job_description(item['description'])
         except Exception:
             continue
 
     # Try main visible container
-    desc_div = job_soup.find("div", class_=re.compile(r"(show-more-less-html__markup|description__text)"))
+    desc_div = job_soup.find("div", class_=DESCRIPTION_CLASS_RE)
     if desc_div:
         return clean_text(desc_div.get_text("\n", strip=True))
 
     # Try fallback containers
-    candidates = job_soup.find_all(["div", "section"], class_=re.compile(r"(description|job-description|details)"))
+    candidates = job_soup.find_all(["div", "section"], class_=DESCRIPTION_FALLBACK_CLASS_RE)
     for c in candidates:
         text = c.get_text("\n", strip=True)
         if len(text) > 100:
@@ -225,12 +366,12 @@ def is_valid_location(text):
     """Simple heuristic for valid location"""
     if not text:
         return False
-    return bool(re.search(r'\b(remote|egypt|cairo|dubai|saudi|uk|usa|canada|germany|france|australia)\b', text.lower()))
+    return bool(LOCATION_RE.search(text))
 
 
 def extract_location(job_soup, company_name=None):
     """Extract job location"""
-    loc_elems = job_soup.find_all(['span', 'div'], class_=re.compile(r'topcard__flavor'))
+    loc_elems = job_soup.find_all(['span', 'div'], class_=TOPCARD_FLAVOR_RE)
     for elem in loc_elems:
         text = elem.get_text(strip=True)
         if is_valid_location(text):
@@ -238,207 +379,215 @@ def extract_location(job_soup, company_name=None):
     return None
 
 
-def extract_employment_type(job_soup):
-    """Extract employment type info"""
-    patterns = r'\b(full.?time|part.?time|contract|internship|temporary|freelance)\b'
-    all_text = job_soup.get_text().lower()
-    match = re.search(patterns, all_text)
+def extract_employment_type(all_text):
+    """Extract employment type info from the page text"""
+    match = EMPLOYMENT_TYPE_RE.search(all_text)
     return match.group(1).title() if match else None
 
 
-def extract_job_flexibility(job_soup):
-    """Extract remote/hybrid/on-site info"""
-    all_text = job_soup.get_text().lower()
-    if "remote" in all_text:
-        return "Remote"
-    if "hybrid" in all_text:
+def extract_job_flexibility(all_text):
+    """Extract remote/hybrid/on-site info from the page text"""
+    # One scan collects every keyword; remote > hybrid > on-site priority is kept
+    found = set()
+    for match in FLEXIBILITY_RE.finditer(all_text):
+        keyword = match.group().lower()
+        # Remote outranks everything, so the rest of the text cannot change the answer
+        if keyword == "remote":
+            return "Remote"
+        found.add(keyword)
+    if "hybrid" in found:
         return "Hybrid"
-    if "on-site" in all_text or "onsite" in all_text:
+    if found:
         return "On-site"
     return None
 
 
-def scrape_linkedin_jobs(search_keyword, location, target_jobs=None, delay_range=(2, 6), timeout=15):
-    """Scrape LinkedIn guest search pages"""
-    base_url = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+def scrape_job_post(session, job_link, rate_limiter, timeout=15):
+    """Fetch and parse a single job page, returning None if the request fails"""
+    rate_limiter.wait()
 
-    search_keyword = (
-    # ====== Core Software & Development ======
-    "software OR backend OR frontend OR full stack OR web OR mobile OR android OR ios OR "
-    "react OR node OR python OR java OR c# OR .net OR php OR ruby OR kotlin OR swift OR "
-    "flutter OR react native OR angular OR vue OR typescript OR javascript OR go OR rust OR "
-    "devops OR cloud OR sre OR infrastructure OR platform OR automation OR ci cd OR "
-    "aws OR azure OR gcp OR kubernetes OR docker OR terraform OR ansible OR linux OR bash OR "
-    "microservices OR api OR rest OR graphql OR serverless OR distributed systems OR scalability OR "
+    job_post = {"job_link": job_link}
+    try:
+        job_resp = session.get(job_link, timeout=timeout)
+        job_resp.raise_for_status()
+    except requests.exceptions.RetryError as e:
+        # Retries ran out (usually repeated 429s), so hold all workers back and slow down after
+        print(f"Error fetching job: {e}")
+        rate_limiter.on_failure()
+        rate_limiter.pause(30, 60)
+        return None
+    except Exception as e:
+        print(f"Error fetching job: {e}")
+        return None
+    rate_limiter.on_success()
 
-    # ====== Data, AI & ML ======
-    "data OR analytics OR etl OR big data OR hadoop OR spark OR databricks OR powerbi OR tableau OR "
-    "ml OR machine learning OR ai OR artificial intelligence OR deep learning OR nlp OR llm OR "
-    "data science OR data engineer OR data scientist OR ml engineer OR mlops OR "
-    "database OR sql OR nosql OR postgres OR mysql OR mongodb OR oracle OR snowflake OR redshift OR "
+    job_soup = BeautifulSoup(
+        job_resp.content, "lxml", parse_only=JOB_STRAINER, from_encoding=job_resp.encoding
+    )
 
-    # ====== Cybersecurity & Networking ======
-    "security OR cybersecurity OR infosec OR appsec OR pentest OR penetration testing OR "
-    "network OR sysadmin OR systems OR infrastructure OR vpn OR soc OR siem OR firewall OR "
-    "identity OR iam OR compliance OR risk OR zero trust OR endpoint OR cloud security OR "
+    # Title
+    title_tag = job_soup.find("h1", class_=TOPCARD_TITLE_RE) or job_soup.find("h1")
+    job_post["job title"] = clean_text(title_tag.get_text(strip=True)) if title_tag else None
 
-    # ====== Embedded, Hardware & IoT ======
-    "embedded OR firmware OR iot OR robotics OR electronics OR fpga OR hardware OR "
-    "arduino OR raspberry pi OR sensor OR automation engineer OR mechatronics OR control systems OR "
+    # Company
+    company_elem = job_soup.find("a", href=COMPANY_HREF_RE)
+    job_post["company"] = clean_text(company_elem.get_text(strip=True)) if company_elem else None
+    job_post["company url"] = get_absolute_url(company_elem["href"]) if company_elem else None
 
-    # ====== Testing & QA ======
-    "qa OR quality assurance OR test automation OR selenium OR cypress OR playwright OR testing OR "
-    "manual testing OR performance testing OR regression testing OR test engineer OR test analyst OR "
+    # Location
+    job_post["location"] = extract_location(job_soup, job_post["company"])
 
-    # ====== UI/UX & Product ======
-    "ui OR ux OR ui/ux OR user interface OR user experience OR "
-    "product design OR visual design OR interaction design OR design systems OR "
-    "usability OR wireframe OR prototype OR figma OR sketch OR adobe xd OR invision OR zeplin OR "
-    "product manager OR technical product manager OR scrum master OR agile coach OR "
-    "service design OR design thinking OR human centered design OR accessibility OR "
+    # Full description (already cleaned)
+    job_post["job description"] = get_full_job_description(job_soup, job_resp.content)
 
-    # ====== Graphic, Motion, 3D & Creative Tech ======
-    "graphic design OR visual design OR motion design OR motion graphics OR animation OR illustrator OR photoshop OR "
-    "after effects OR premiere OR indesign OR blender OR maya OR cinema 4d OR houdini OR 3ds max OR "
-    "concept art OR digital art OR creative technologist OR creative developer OR multimedia OR "
-    "game OR game design OR game developer OR unity OR unreal OR vr OR ar OR xr OR virtual reality OR augmented reality OR "
-    "storyboard OR video editing OR content creation OR vfx OR sfx OR compositing OR visual effects OR "
+    # Page text is shared by the employment type and flexibility lookups
+    all_text = job_soup.get_text()
 
-    # ====== Blockchain, Web3 & Emerging Tech ======
-    "blockchain OR crypto OR solidity OR smart contract OR web3 OR nft OR dapp OR defi OR metaverse OR "
+    # Employment type
+    job_post["employment type"] = extract_employment_type(all_text)
 
-    # ====== Support, Operations & General IT ======
-    "support OR helpdesk OR service desk OR it support OR systems support OR technical support OR "
-    "network engineer OR desktop support OR system administrator OR field engineer OR "
-    "technician OR specialist OR consultant OR architect OR solution architect OR software architect OR systems architect OR "
+    # Flexibility
+    job_post["job flexibility"] = extract_job_flexibility(all_text[:FLEXIBILITY_SCAN_CHARS])
+
+    return job_post
 
-    # ====== Experience Levels ======
-    "lead OR senior OR junior OR intern OR entry level OR associate OR graduate OR trainee OR "
-    "manager OR director OR head OR principal OR vp OR cto OR team lead OR mentor OR "
-    "it OR tech OR technology OR information technology"
-    )
 
-    keyword_q = urllib.parse.quote_plus(search_keyword)
+def collect_job_posts(futures, all_jobs):
+    """Wait for submitted job-page fetches and append the successful posts in submission order"""
+    for future in futures:
+        job_post = future.result()
+        if job_post is None:
+            continue
+        all_jobs.append(job_post)
+        print(f"Job {len(all_jobs)}: {job_post['job title']} - {job_post['company']}")
+
+
+def scrape_linkedin_jobs(search_keyword, location, target_jobs=None, delay_range=(0.5, 1.5), timeout=15):
+    """Scrape LinkedIn guest search pages"""
+    base_url = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
+    # An empty search_keyword falls back to the default keyword list
+    keyword_q = urllib.parse.quote_plus(search_keyword) if search_keyword else SEARCH_KEYWORDS_Q
     location_q = urllib.parse.quote_plus(location)
-    
+    # Only start changes between pages, so the encoded query is built once
+    search_url = f"{base_url}?keywords={keyword_q}&location={location_q}&f_TPR=r86400&start="
 
     session = create_session()
+    rate_limiter = RateLimiter(delay_range)
+    page_rng = random.Random()
     all_jobs = []
-    start, page_num, jobs_found = 0, 0, 0
-    seen_links = set()
-
-    while True:
-        url = f"{base_url}?keywords={keyword_q}&location={location_q}&f_TPR=r86400&start={start}"
-
-        print(f"\nFetching page {page_num + 1} (start={start})...")
-        try:
-            resp = session.get(url, timeout=timeout)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"Error fetching page {page_num + 1}: {e}")
-            break
-
-        soup = BeautifulSoup(resp.text, "html.parser")
-        job_listings = soup.find_all("li")
-        if not job_listings:
-            print("No more job listings found. Ending scraping.")
-            break
-
-        print(f"Found {len(job_listings)} jobs on page {page_num + 1}")
-
-        for job in job_listings:
-            job_link_elem = job.find("a", href=True)
-            if not job_link_elem:
-                continue
-            job_link = get_absolute_url(job_link_elem["href"])
-            if not job_link or job_link in seen_links:
-                continue
-            seen_links.add(job_link)
-
-            job_post = {"job_link": job_link}
+    start, page_num = 0, 0
+    seen_ids = set()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        # Job pages from the previous search page keep downloading while the next one is fetched
+        pending = []
+        while True:
+            if target_jobs and len(all_jobs) + len(pending) >= target_jobs:
+                # Enough fetches are in flight; only search further if some of them failed
+                collect_job_posts(pending, all_jobs)
+                pending = []
+                if len(all_jobs) >= target_jobs:
+                    print("Reached target, stopping.")
+                    break
+
+            if page_num:
+                time.sleep(page_rng.uniform(2, 4))
+
+            url = search_url + str(start)
+
+            print(f"\nFetching page {page_num + 1} (start={start})...")
             try:
-                job_resp = session.get(job_link, timeout=timeout)
-                job_resp.raise_for_status()
+                resp = session.get(url, timeout=timeout)
+                resp.raise_for_status()
             except Exception as e:
-                print(f"Error fetching job: {e}")
-                continue
-
-            job_soup = BeautifulSoup(job_resp.text, "html.parser")
-
-            # Title
-            title_tag = job_soup.find("h1", class_=re.compile("topcard__title")) or job_soup.find("h1")
-            job_post["job title"] = clean_text(title_tag.get_text(strip=True)) if title_tag else None
+                print(f"Error fetching page {page_num + 1}: {e}")
+                break
 
-            # Company
-            company_elem = job_soup.find("a", href=re.compile(r"/company/"))
-            job_post["company"] = clean_text(company_elem.get_text(strip=True)) if company_elem else None
-            job_post["company url"] = get_absolute_url(company_elem["href"]) if company_elem else None
+            job_ids = JOB_ID_RE.findall(resp.content)
+            if not job_ids:
+                print("No more job listings found. Ending scraping.")
+                break
 
-            # Location
-            job_post["location"] = extract_location(job_soup, job_post["company"])
+            print(f"Found {len(job_ids)} jobs on page {page_num + 1}")
 
-            # Full description
-            job_post["job description"] = get_full_job_description(job_soup)
-            # Clean description
-            job_post["job description"] = clean_job_description(job_post["job description"])
+            # Dedupe on the raw ids in one batch, keeping page order
+            new_ids = [job_id for job_id in dict.fromkeys(job_ids) if job_id not in seen_ids]
+            seen_ids.update(new_ids)
+            # Canonical view URLs drop the per-search tracking params, so links stay stable across runs
+            job_links = [JOB_VIEW_URL.format(job_id.decode()) for job_id in new_ids]
 
-            # Employment type
-            job_post["employment type"] = extract_employment_type(job_soup)
+            # Only fetch as many pages as are still needed to reach the target
+            if target_jobs:
+                job_links = job_links[:target_jobs - len(all_jobs) - len(pending)]
 
-            # Flexibility
-            job_post["job flexibility"] = extract_job_flexibility(job_soup)
+            futures = [
+                executor.submit(scrape_job_post, session, link, rate_limiter, timeout) for link in job_links
+            ]
+            collect_job_posts(pending, all_jobs)
+            pending = futures
 
-            all_jobs.append(job_post)
-            jobs_found += 1
-            print(f"Job {jobs_found}: {job_post['job title']} - {job_post['company']}")
+            page_num += 1
+            start += len(job_ids)
 
-            if target_jobs and jobs_found >= target_jobs:
-                print("Reached target, stopping.")
-                return pd.DataFrame(all_jobs)
-
-            time.sleep(random.uniform(*delay_range))
-
-        page_num += 1
-        start += len(job_listings)
-        time.sleep(random.uniform(2, 4))
+        collect_job_posts(pending, all_jobs)
 
     return pd.DataFrame(all_jobs)
 
 def get_final_salaries(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df["mapped_onet_title"] = None
-    df["onet_score"] = None
-    df["mean_salary_egp"] = None
-    df["median_salary_egp"] = None
-    df["p10_salary_egp"] = None
-    df["p90_salary_egp"] = None
-    df["salary_datapoints"] = None
 
     # Always reset index first to align i with row positions
     df = df.reset_index(drop=True)
 
-    for i, title in enumerate(df["job title"]):
-        onet_match, score = map_to_onet(title)
+    # Results are collected per column and assigned once after the loop
+    n_rows = len(df)
+    mapped_titles = [None] * n_rows
+    salary_datapoints = [None] * n_rows
+    salary_stats = {
+        col: np.full(n_rows, np.nan)
+        for col in ["onet_score", "mean_salary_egp", "median_salary_egp", "p10_salary_egp", "p90_salary_egp"]
+    }
+
+    matches = map_to_onet(df["job title"].tolist())
+
+    # Fetch one histogram per distinct ONET title; requests overlap but still start
+    # SLEEP_INTERVAL apart, so the Adzuna request rate is unchanged
+    unique_onet = list(dict.fromkeys(match for match, _ in matches if match))
+    api_limiter = RateLimiter((SLEEP_INTERVAL, SLEEP_INTERVAL))
+
+    def fetch_histogram(onet_title):
+        api_limiter.wait()
+        return get_salary_histogram(onet_title)
+
+    # PPP is fetched on first use rather than at import
+    ppp = get_ppp()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        histograms = dict(zip(unique_onet, executor.map(fetch_histogram, unique_onet)))
+
+    for i, (onet_match, score) in enumerate(matches):
         if not onet_match:
             continue
 
-        hist = get_salary_histogram(onet_match)
-        mean, median, percentiles, counter = aggregate_stats(hist)
+        mean, median, percentiles, counter = aggregate_stats(histograms[onet_match])
 
         # Skip if histogram empty
         if mean is None or percentiles is None:
             continue
 
-        # Assign safely (index-based)
-        df.loc[i, "mapped_onet_title"] = onet_match
-        df.loc[i, "onet_score"] = round(score or 0, 2)
-        df.loc[i, "mean_salary_egp"] = round(mean / 12 * PPP, 2)
-        df.loc[i, "median_salary_egp"] = round(median / 12 * PPP, 2)
-        df.loc[i, "p10_salary_egp"] = round(percentiles[0] / 12 * PPP, 2)
-        df.loc[i, "p90_salary_egp"] = round(percentiles[1] / 12 * PPP, 2)
-        df.loc[i, "salary_datapoints"] = int(counter or 0)
-
-        time.sleep(SLEEP_INTERVAL)
+        mapped_titles[i] = onet_match
+        salary_stats["onet_score"][i] = round(score or 0, 2)
+        salary_stats["mean_salary_egp"][i] = round(mean / 12 * ppp, 2)
+        salary_stats["median_salary_egp"][i] = round(median / 12 * ppp, 2)
+        salary_stats["p10_salary_egp"][i] = round(percentiles[0] / 12 * ppp, 2)
+        salary_stats["p90_salary_egp"][i] = round(percentiles[1] / 12 * ppp, 2)
+        salary_datapoints[i] = int(counter or 0)
+
+    df["mapped_onet_title"] = mapped_titles
+    for col, values in salary_stats.items():
+        df[col] = values
+    df["salary_datapoints"] = pd.array(salary_datapoints, dtype="Int64")
 
     return df
 